@@ -1,10 +1,33 @@
 # scripts/daily_report.py
+import atexit
+import hashlib
+import heapq
+import json
 import os
-import re
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from concurrent.futures import Future, wait
 from datetime import datetime, timezone, timedelta
+from functools import partial
+from io import BytesIO
+from itertools import islice
 from pathlib import Path
+from urllib.parse import urlencode
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from common import write_heartbeat
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # stdlib fallback keeps the script runnable without orjson
+    _loads = json.loads
 
 REPO_OWNER = os.getenv("GITHUB_REPOSITORY_OWNER", "")
 REPO_FULL = os.getenv("GITHUB_REPOSITORY", "")  # e.g., owner/name
@@ -13,21 +36,118 @@ GH_TOKEN = os.getenv("GH_TOKEN") or os.getenv("GITHUB_TOKEN")
 README = Path("README.md")
 START = "<!-- DAILY-SECTION:START -->"
 END = "<!-- DAILY-SECTION:END -->"
+_START_B = START.encode("utf-8")
+_END_B = END.encode("utf-8")
+CACHE_DIR = Path(".cache")
+HTTP_CACHE_FILE = CACHE_DIR / "http_cache.json"
+BLOCK_DEADLINE = 20  # seconds to wait for all blocks together
+
+# One pooled, keep-alive session shared by every block
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+GH_HEADERS = {"Accept": "application/vnd.github+json"}
+if GH_TOKEN:
+    GH_HEADERS["Authorization"] = f"Bearer {GH_TOKEN}"
+
+# ----- Conditional-request cache (ETag -> body), persisted between runs -----
+
+def _load_http_cache():
+    try:
+        return _loads(HTTP_CACHE_FILE.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+HTTP_CACHE = _load_http_cache()
+
+@atexit.register
+def _save_http_cache():
+    if not HTTP_CACHE:
+        return
+    CACHE_DIR.mkdir(exist_ok=True)
+    # Snapshot first: blocks past the deadline may still be adding entries
+    HTTP_CACHE_FILE.write_text(json.dumps(dict(HTTP_CACHE)), encoding="utf-8")
 
-def gh_headers():
-    h = {"Accept": "application/vnd.github+json"}
-    if GH_TOKEN:
-        h["Authorization"] = f"Bearer {GH_TOKEN}"
+def _cache_key(url, params=None):
+    return url + "?" + urlencode(sorted((params or {}).items()))
+
+def _conditional_headers(key):
+    h = dict(GH_HEADERS)
+    cached = HTTP_CACHE.get(key)
+    if cached:
+        h["If-None-Match"] = cached["etag"]
     return h
 
 def fetch_json(url, params=None):
-    r = requests.get(url, headers=gh_headers(), params=params, timeout=30)
+    key = _cache_key(url, params)
+    r = SESSION.get(url, headers=_conditional_headers(key), params=params, timeout=30)
+    if r.status_code == 304:
+        return HTTP_CACHE[key]["body"]
+    r.raise_for_status()
+    body = _loads(r.content)
+    if r.headers.get("ETag"):
+        HTTP_CACHE[key] = {"etag": r.headers["ETag"], "body": body}
+    return body
+
+# Raw response bodies for non-GitHub endpoints, reused while younger than `ttl`
+def cached_get(url, params=None, ttl=3600, timeout=20):
+    key = hashlib.sha1(f"{url}?{urlencode(params or {})}".encode()).hexdigest()
+    path = CACHE_DIR / f"{key}.bin"
+    if path.exists() and time.time() - path.stat().st_mtime < ttl:
+        return path.read_bytes()
+    r = SESSION.get(url, params=params, timeout=timeout)
     r.raise_for_status()
-    return r.json()
+    CACHE_DIR.mkdir(exist_ok=True)
+    # Write then rename so an interrupted run never leaves a truncated entry
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(r.content)
+    os.replace(tmp, path)
+    return r.content
 
 # ----- Blocks -----
 
-def top_languages(limit=6):
+# repositoryOwner resolves both users and organizations
+LANGUAGES_QUERY = """
+query($login: String!) {
+  repositoryOwner(login: $login) {
+    repositories(first: 100, isFork: false, privacy: PUBLIC, ownerAffiliations: OWNER) {
+      nodes {
+        languages(first: 20, orderBy: {field: SIZE, direction: DESC}) {
+          edges { size node { name } }
+        }
+      }
+    }
+  }
+}
+"""
+
+def _languages_graphql():
+    # One GraphQL round-trip instead of a REST call per repo
+    r = SESSION.post(
+        "https://api.github.com/graphql",
+        headers=GH_HEADERS,
+        json={"query": LANGUAGES_QUERY, "variables": {"login": REPO_OWNER}},
+        timeout=30,
+    )
+    r.raise_for_status()
+    payload = _loads(r.content)
+    if payload.get("errors"):
+        print(f"Languages GraphQL errors: {payload['errors']}")
+    owner = (payload.get("data") or {}).get("repositoryOwner") or {}
+    agg = {}
+    for repo in owner.get("repositories", {}).get("nodes", []):
+        for edge in repo["languages"]["edges"]:
+            lang = edge["node"]["name"]
+            agg[lang] = agg.get(lang, 0) + edge["size"]
+    return agg
+
+def _languages_rest():
     url = f"https://api.github.com/users/{REPO_OWNER}/repos"
     repos = fetch_json(url, params={"per_page": 100})
     agg = {}
@@ -40,51 +160,78 @@ def top_languages(limit=6):
             langs = {}
         for lang, bytes_ in langs.items():
             agg[lang] = agg.get(lang, 0) + bytes_
+    return agg
+
+def top_languages(limit=6):
+    # GraphQL requires auth; without a token use the per-repo REST calls
+    try:
+        agg = _languages_graphql() if GH_TOKEN else _languages_rest()
+    except Exception as exc:
+        print(f"Languages: {exc}")
+        agg = {}
     if not agg:
         return "### 🧪 Languages\n_No data._"
-    top = sorted(agg.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+    top = heapq.nlargest(limit, agg.items(), key=lambda kv: kv[1])
     total = sum(v for _, v in top) or 1
-    lines = [f"- **{lang}**: {round(v * 100 / total, 1)}%" for lang, v in top]
-    return "### 🧪 Languages (approx)\n" + "\n".join(lines)
+    return "### 🧪 Languages (approx)\n" + "\n".join(
+        f"- **{lang}**: {round(v * 100 / total, 1)}%" for lang, v in top
+    )
 
 def list_public_repos(limit=5):
     url = f"https://api.github.com/users/{REPO_OWNER}/repos"
     repos = fetch_json(url, params={"sort": "updated", "per_page": 100})
-    repos = [r for r in repos if not r.get("fork")]
-    repos = sorted(repos, key=lambda r: r["pushed_at"], reverse=True)[:limit]
+    repos = heapq.nlargest(limit, (r for r in repos if not r.get("fork")), key=lambda r: r["pushed_at"])
     if not repos:
         return "### 🔧 Recent Repos\n_No public repos found._"
-    lines = []
-    for r in repos:
-        name = r["name"]
-        desc = r["description"] or ""
-        stars = r["stargazers_count"]
-        pushed = r["pushed_at"].replace("T", " ").replace("Z", " UTC")
-        lines.append(f"- [{name}](https://github.com/{REPO_OWNER}/{name}) — ★{stars} — _last push {pushed}_  \n  {desc}")
-    return "### 🔧 Recent Repos\n" + "\n".join(lines)
-
-def recent_activity(limit=5, days=7):
+    return "### 🔧 Recent Repos\n" + "\n".join(
+        f"- [{r['name']}](https://github.com/{REPO_OWNER}/{r['name']}) — ★{r['stargazers_count']} — "
+        f"_last push {r['pushed_at'].replace('T', ' ').replace('Z', ' UTC')}_  \n  {r['description'] or ''}"
+        for r in repos
+    )
+
+# GitHub timestamps are fixed-width "YYYY-MM-DDTHH:MM:SSZ"; slicing beats fromisoformat
+def _parse_ts(s):
+    return datetime(
+        int(s[:4]), int(s[5:7]), int(s[8:10]),
+        int(s[11:13]), int(s[14:16]), int(s[17:19]),
+        tzinfo=timezone.utc,
+    )
+
+def recent_activity(limit=5, days=7, now=None):
     url = f"https://api.github.com/users/{REPO_OWNER}/events/public"
     events = fetch_json(url, params={"per_page": 100})
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=days)
+    # ISO-8601 UTC strings sort chronologically, so filter before parsing
+    cutoff_s = cutoff.strftime("%Y-%m-%dT%H:%M:%SZ")
+    fresh = (e for e in events if e["created_at"] >= cutoff_s)
+    body = "\n".join(
+        f"- {_parse_ts(e['created_at']).strftime('%Y-%m-%d %H:%M UTC')} — "
+        f"**{e['type'].replace('Event', '')}** in `{e['repo']['name']}`"
+        for e in islice(fresh, limit)
+    )
+    return "### ⚡ Recent Activity (7d)\n" + (body or "_No public activity in the last week._")
+
+# Streams RSS <item> / Atom <entry> elements and stops after `limit`
+def _feed_items(data, limit):
     items = []
-    for e in events:
-        created = datetime.fromisoformat(e["created_at"].replace("Z", "+00:00"))
-        if created < cutoff:
+    for _, el in ET.iterparse(BytesIO(data), events=("end",)):
+        if el.tag.rsplit("}", 1)[-1] not in ("item", "entry"):
             continue
-        t = e["type"].replace("Event", "")
-        repo = e["repo"]["name"]
-        items.append(f"- {created.strftime('%Y-%m-%d %H:%M UTC')} — **{t}** in `{repo}`")
+        title = (el.findtext("{*}title") or "").strip()
+        link_el = el.find("{*}link")
+        link = ""
+        if link_el is not None:
+            link = (link_el.text or link_el.get("href") or "").strip()
+        items.append(f"- [{title}]({link})")
+        el.clear()
         if len(items) >= limit:
             break
-    return "### ⚡ Recent Activity (7d)\n" + ("\n".join(items) if items else "_No public activity in the last week._")
+    return items
 
 def rss_digest(feed_url="https://news.ycombinator.com/rss", limit=5):
     try:
-        xml = requests.get(feed_url, timeout=20).text
-        titles = re.findall(r"<title>([^<]+)</title>", xml)[2:limit+2]
-        links = re.findall(r"<link>(https?://[^<]+)</link>", xml)[1:limit+1]
-        items = [f"- [{t}]({l})" for t, l in zip(titles, links)]
+        data = cached_get(feed_url)
+        items = _feed_items(data, limit)
         return "### 📰 Today’s Headlines (HN)\n" + ("\n".join(items) if items else "_No items._")
     except Exception:
         return "### 📰 Today’s Headlines\n_Failed to fetch feed._"
@@ -105,26 +252,34 @@ def help_wanted(limit=5):
         return "### 🆘 Help Wanted\n_Failed to fetch._"
 
 def markets_snapshot():
-    import requests as rq
     fx_pairs = os.getenv("FX_PAIRS", "EURUSD;EURGBP").split(";")
     lines = []
 
-    # FX rates
+    # FX rates (one request per base currency)
     try:
-        for p in fx_pairs:
-            p = p.strip().upper()
-            if len(p) == 6:
-                base, quote = p[:3], p[3:]
-                r = rq.get(f"https://api.exchangerate.host/latest?base={base}&symbols={quote}", timeout=15).json()
-                rate = r.get("rates", {}).get(quote)
-                if rate:
-                    lines.append(f"- **{base}/{quote}**: {round(rate, 4)}")
+        pairs = [p.strip().upper() for p in fx_pairs]
+        pairs = [(p[:3], p[3:]) for p in pairs if len(p) == 6]
+        by_base = defaultdict(list)
+        for base, quote in pairs:
+            by_base[base].append(quote)
+        rates = {}
+        for base, quotes in by_base.items():
+            r = _loads(cached_get(
+                "https://api.exchangerate.host/latest",
+                params={"base": base, "symbols": ",".join(quotes)},
+                timeout=15,
+            ))
+            rates[base] = r.get("rates", {})
+        for base, quote in pairs:
+            rate = rates[base].get(quote)
+            if rate:
+                lines.append(f"- **{base}/{quote}**: {round(rate, 4)}")
     except Exception:
         lines.append("- FX: _failed to fetch_")
 
     # BTC/EUR
     try:
-        c = rq.get("https://api.coindesk.com/v1/bpi/currentprice/EUR.json", timeout=15).json()
+        c = _loads(cached_get("https://api.coindesk.com/v1/bpi/currentprice/EUR.json", timeout=15))
         eur = c.get("bpi", {}).get("EUR", {}).get("rate_float")
         if eur:
             lines.append(f"- **BTC/EUR**: {int(eur):,}".replace(",", " "))
@@ -137,10 +292,8 @@ def stackoverflow_digest():
     tags = os.getenv("SO_TAGS", "python;java").replace(";", "+")
     url = f"https://stackoverflow.com/feeds/tag?tagnames={tags}&sort=newest"
     try:
-        xml = requests.get(url, timeout=20).text
-        titles = re.findall(r"<title>([^<]+)</title>", xml)[2:7]
-        links = re.findall(r"<link rel=\"alternate\" type=\"text/html\" href=\"([^\"]+)\"", xml)[:5]
-        items = [f"- [{t}]({l})" for t, l in zip(titles, links)]
+        data = cached_get(url)
+        items = _feed_items(data, 5)
         return "### 🧩 Stack Overflow (newest)\n" + ("\n".join(items) if items else "_No items._")
     except Exception:
         return "### 🧩 Stack Overflow\n_Failed to fetch._"
@@ -157,7 +310,7 @@ def weather_block():
             "current_weather": "true",
             "timezone": "auto",
         }
-        data = requests.get(url, params=params, timeout=20).json()
+        data = _loads(cached_get(url, params=params))
         cur = data.get("current_weather", {})
         daily = data.get("daily", {})
         if not cur:
@@ -179,42 +332,74 @@ def til_prompt():
 
 # ----- Assemble & write -----
 
+# Daemon threads, unlike ThreadPoolExecutor workers, are not joined at
+# interpreter exit, so a stalled block cannot outlive BLOCK_DEADLINE
+def _run_daemon(fn):
+    fut = Future()
+    def run():
+        fut.set_running_or_notify_cancel()
+        try:
+            fut.set_result(fn())
+        except BaseException as exc:
+            fut.set_exception(exc)
+    threading.Thread(target=run, daemon=True).start()
+    return fut
+
 def assemble():
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-    parts = [
-        f"_Last update: **{now}**_\n",
-        top_languages(),
-        list_public_repos(),
-        recent_activity(),
-        help_wanted(),
-        markets_snapshot(),
-        stackoverflow_digest(),
-        weather_block(),
-        rss_digest(),
-        til_prompt(),
-    ]
+    now = datetime.now(timezone.utc)
+    # (block, heading used if it raises or misses the deadline)
+    blocks = (
+        (top_languages, "🧪 Languages"),
+        (list_public_repos, "🔧 Recent Repos"),
+        (partial(recent_activity, now=now), "⚡ Recent Activity (7d)"),
+        (help_wanted, "🆘 Help Wanted"),
+        (markets_snapshot, "💹 Markets"),
+        (stackoverflow_digest, "🧩 Stack Overflow"),
+        (weather_block, "🌤️ Weather"),
+        (rss_digest, "📰 Today’s Headlines"),
+    )
+    # Blocks are independent and I/O-bound, so fetch them concurrently and
+    # stop waiting after BLOCK_DEADLINE instead of summing every timeout
+    futs = [_run_daemon(fn) for fn, _ in blocks]
+    done, _ = wait(futs, timeout=BLOCK_DEADLINE)
+    results = []
+    for fut, (_, heading) in zip(futs, blocks):
+        if fut in done and fut.exception() is None:
+            results.append(fut.result())
+        else:
+            print(f"{heading}: {fut.exception() if fut in done else 'timed out'}")
+            results.append(f"### {heading}\n_Failed to fetch._")
+    stamp = now.strftime("%Y-%m-%d %H:%M UTC")
+    parts = [f"_Last update: **{stamp}**_\n", *results, til_prompt()]
     return "\n\n".join(parts)
 
 def ensure_readme_section(content: str):
+    # Work in bytes end to end: one encode of the content, no decode of README
+    content_b = content.encode("utf-8")
+    section = _START_B + b"\n" + content_b + b"\n" + _END_B
     if not README.exists():
-        README.write_text(f"# {REPO_FULL}\n\n{START}\n{content}\n{END}\n", encoding="utf-8")
+        README.write_bytes(f"# {REPO_FULL}\n\n".encode("utf-8") + section + b"\n")
         return True
-    txt = README.read_text(encoding="utf-8")
-    if START in txt and END in txt:
-        new = re.sub(
-            rf"{re.escape(START)}.*?{re.escape(END)}",
-            f"{START}\n{content}\n{END}",
-            txt,
-            flags=re.DOTALL,
-        )
+    old = README.read_bytes()
+    i = old.find(_START_B)
+    j = old.find(_END_B, i + len(_START_B)) if i != -1 else -1
+    if i != -1 and j != -1:
+        if old[i + len(_START_B):j].strip() == content_b.strip():
+            return False
+        new = old[:i] + section + old[j + len(_END_B):]
+    elif _START_B in old and _END_B in old:
+        new = old
     else:
-        new = txt.rstrip() + f"\n\n{START}\n{content}\n{END}\n"
-    if new != txt:
-        README.write_text(new, encoding="utf-8")
+        new = old.rstrip() + b"\n\n" + section + b"\n"
+    if new != old:
+        README.write_bytes(new)
         return True
     return False
 
 def main():
+    # Heartbeat rides along in this process instead of a separate interpreter
+    if "--heartbeat" in sys.argv[1:]:
+        write_heartbeat()
     md = assemble()
     changed = ensure_readme_section(md)
     print("Updated README section." if changed else "No changes needed.")